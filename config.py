@@ -10,4 +10,48 @@ GOOGLE_SHEET_NAME = os.getenv("GOOGLE_SHEET_NAME")
 GOOGLE_CREDENTIALS_FILE = os.getenv("GOOGLE_CREDENTIALS_FILE")
 
 TICKERS = ['RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS']
-BACKTEST_MONTHS = 6
\ No newline at end of file
+BACKTEST_MONTHS = 6
+
+# Optional file listing the tickers to scan (one per line, or a CSV whose first
+# column is the ticker). TICKERS is used when it is not set.
+UNIVERSE_FILE = os.getenv("UNIVERSE_FILE")
+
+# Streaming scans fetch, analyze and log SCAN_CHUNK_SIZE tickers at a time
+STREAMING_SCAN = os.getenv("STREAMING_SCAN", "false").lower() in ("1", "true", "yes")
+SCAN_CHUNK_SIZE = int(os.getenv("SCAN_CHUNK_SIZE", "50"))
+
+# Data fetching: concurrent downloads, per-request timeout (s), retries with
+# exponential backoff (s), and a token-bucket rate limit (requests/s and burst size)
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "20"))
+FETCH_MAX_RETRIES = int(os.getenv("FETCH_MAX_RETRIES", "3"))
+FETCH_BACKOFF_SECONDS = float(os.getenv("FETCH_BACKOFF_SECONDS", "1.0"))
+FETCH_RATE_LIMIT = float(os.getenv("FETCH_RATE_LIMIT", "2.0"))
+FETCH_BURST = int(os.getenv("FETCH_BURST", "5"))
+
+# Strategies evaluated on every ticker, comma separated (see strategy.STRATEGIES)
+STRATEGIES = [name.strip() for name in os.getenv("STRATEGIES", "rsi_sma_crossover").split(",") if name.strip()]
+
+# Local SQLite database that records every scan's trades, signals and ML metrics
+TRADE_DB_PATH = os.getenv("TRADE_DB_PATH", "trades.db")
+# Seconds to wait for another process to release a lock on the database before giving up
+TRADE_DB_TIMEOUT = float(os.getenv("TRADE_DB_TIMEOUT", "30"))
+
+# Distributed scans: shard directory shared by coordinator and workers, local worker
+# processes to start, tickers per shard, lease (s) after which a silent worker's shard
+# is requeued, and the overall time limit (s) for a scan
+DIST_BROKER_DIR = os.getenv("DIST_BROKER_DIR", "broker")
+DIST_WORKERS = int(os.getenv("DIST_WORKERS", "4"))
+DIST_SHARD_SIZE = int(os.getenv("DIST_SHARD_SIZE", "25"))
+DIST_LEASE_SECONDS = float(os.getenv("DIST_LEASE_SECONDS", "120"))
+DIST_SCAN_TIMEOUT = float(os.getenv("DIST_SCAN_TIMEOUT", "3600"))
+
+# Profiling (main.py --profile): output directory and stack sampling interval (s)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+# Compute indicators for all tickers at once on an aligned (time x ticker) panel
+PANEL_MODE = os.getenv("PANEL_MODE", "false").lower() in ("1", "true", "yes")
+
+# RSI smoothing used by strategy, ML features and panel mode: "simple" or "wilder"
+RSI_METHOD = os.getenv("RSI_METHOD", "simple").lower()
\ No newline at end of file
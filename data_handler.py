@@ -1,11 +1,212 @@
 import yfinance as yf
 import pandas as pd
+import asyncio
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+from config import (FETCH_CONCURRENCY, FETCH_TIMEOUT, FETCH_MAX_RETRIES,
+                    FETCH_BACKOFF_SECONDS, FETCH_RATE_LIMIT, FETCH_BURST, SCAN_CHUNK_SIZE)
+
+_session = None
+_session_lock = threading.Lock()
+
+class TokenBucket:
+    """Async token-bucket rate limiter shared by all concurrent fetches."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Waits until a request token is available and takes it."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class DownloadPool:
+    """
+    Long-lived daemon threads that run blocking downloads for the event loop.
+
+    A curl_cffi session keeps one curl handle, with its own connection cache, per
+    thread, so downloads run on reused threads to keep their connections warm.
+    A thread whose download was abandoned after a timeout stays busy until the
+    request's own timeout ends it; a spare thread is started only when no idle
+    one is left, so a few hung requests never starve the rest of the scan.
+    Daemon threads never block interpreter exit.
+    """
+
+    def __init__(self):
+        self.tasks = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.idle = 0
+
+    def run(self, func):
+        """Schedules func on a pool thread and returns an awaitable for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self.lock:
+            spawn = self.idle == 0
+            if not spawn:
+                self.idle -= 1
+        self.tasks.put((loop, future, func))
+        if spawn:
+            threading.Thread(target=self._work, daemon=True).start()
+        return future
+
+    @staticmethod
+    def _settle(future, value, error):
+        if future.done():  # The caller timed out and cancelled it
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def _work(self):
+        while True:
+            loop, future, func = self.tasks.get()
+            try:
+                value, error = func(), None
+            except Exception as e:
+                value, error = None, e
+            with self.lock:  # Free before the caller resumes, so its next download reuses this thread
+                self.idle += 1
+            try:
+                loop.call_soon_threadsafe(self._settle, future, value, error)
+            except RuntimeError:  # Event loop already closed
+                pass
+
+_download_pool = DownloadPool()
+
+def get_session(pool_size: int = FETCH_CONCURRENCY):
+    """
+    Returns the shared, connection-pooled HTTP session used for every download.
+
+    Args:
+        pool_size (int): Connections kept per host by the requests fallback. curl_cffi
+            pools per download thread instead, see DownloadPool.
+    """
+    global _session
+    with _session_lock:  # The first burst of downloads must not each build their own session
+        if _session is None:
+            try:
+                # yfinance works best with a curl_cffi session, which pools connections itself
+                from curl_cffi import requests as curl_requests
+                _session = curl_requests.Session(impersonate="chrome")
+            except ImportError:
+                import requests
+                from requests.adapters import HTTPAdapter
+                _session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                _session.mount("https://", adapter)
+                _session.mount("http://", adapter)
+    return _session
+
+def _prepare_data(ticker: str, data: pd.DataFrame):
+    """Validates a downloaded frame and normalizes its price columns. Returns None if unusable."""
+    if len(data) < 50:  # Minimum required for technical indicators
+        print(f"Warning: {ticker} has insufficient data ({len(data)} rows). Minimum 50 required.")
+        return None
+
+    # Check available columns and handle column name differences
+    print(f"Available columns for {ticker}: {list(data.columns)}")
+
+    # Handle different column names - yfinance might use 'Close' instead of 'Adj Close'
+    if 'Adj Close' not in data.columns and 'Close' in data.columns:
+        data['Adj Close'] = data['Close']
+        print(f"Using 'Close' as 'Adj Close' for {ticker}")
+
+    return data
+
+async def _fetch_ticker(ticker, start_date, end_date, semaphore, bucket):
+    """
+    Downloads one ticker with a timeout, retrying with exponential backoff.
+
+    yfinance's own timeout ends a slow request; wait_for is a backstop for one that
+    ignores it, releasing the concurrency slot while the download is left to finish
+    on its pool thread.
+
+    Returns:
+        tuple: (DataFrame or None, error message or None)
+    """
+    error = None
+
+    for attempt in range(FETCH_MAX_RETRIES + 1):
+        if attempt:
+            delay = FETCH_BACKOFF_SECONDS * (2 ** (attempt - 1)) * (1 + random.random())
+            print(f"Retrying {ticker} in {delay:.1f}s (attempt {attempt + 1}/{FETCH_MAX_RETRIES + 1})...")
+            await asyncio.sleep(delay)
+
+        async with semaphore:
+            await bucket.acquire()
+            try:
+                print(f"Fetching data for {ticker}...")
+                data = await asyncio.wait_for(
+                    _download_pool.run(lambda: yf.download(
+                        ticker, start=start_date, end=end_date, progress=False,
+                        timeout=FETCH_TIMEOUT, session=get_session())),
+                    timeout=FETCH_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                error = f"timed out after {FETCH_TIMEOUT}s"
+                continue
+            except Exception as e:
+                error = str(e)
+                continue
+
+        # yfinance reports network failures as an empty frame, so treat that as retryable too
+        if data is None or data.empty:
+            error = "no data returned"
+            continue
+        return data, None
+
+    return None, error
+
+async def fetch_data_async(tickers: list, start_date: str, end_date: str):
+    """
+    Fetches all tickers concurrently over a shared session, bounded by
+    FETCH_CONCURRENCY and rate limited to FETCH_RATE_LIMIT requests per second.
+
+    Returns:
+        tuple: (dict of ticker -> DataFrame, dict of ticker -> error for tickers that failed every attempt)
+    """
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+    bucket = TokenBucket(FETCH_RATE_LIMIT, FETCH_BURST)
+
+    results = await asyncio.gather(*[
+        _fetch_ticker(ticker, start_date, end_date, semaphore, bucket)
+        for ticker in tickers
+    ])
+
+    stock_data = {}
+    failures = {}
+    for ticker, (data, error) in zip(tickers, results):
+        if data is None:
+            failures[ticker] = error
+            continue
+        data = _prepare_data(ticker, data)
+        if data is not None:
+            stock_data[ticker] = data
+            print(f"Successfully fetched data for {ticker} ({len(data)} rows)")
+    return stock_data, failures
+
 def fetch_data(tickers: list, start_date: str, end_date: str) -> dict:
     """
     [cite_start]Fetches intraday or daily stock data for a list of NIFTY 50 stocks[cite: 10].
-    
+
     Args:
         tickers (list): List of stock tickers.
         start_date (str): Start date for data fetching (YYYY-MM-DD).
@@ -17,7 +218,7 @@ def fetch_data(tickers: list, start_date: str, end_date: str) -> dict:
     if not tickers:
         print("Error: No tickers provided")
         return {}
-    
+
     # Validate date format
     try:
         datetime.strptime(start_date, '%Y-%m-%d')
@@ -25,34 +226,66 @@ def fetch_data(tickers: list, start_date: str, end_date: str) -> dict:
     except ValueError:
         print("Error: Invalid date format. Use YYYY-MM-DD format.")
         return {}
-    
-    stock_data = {}
-    for ticker in tickers:
-        try:
-            print(f"Fetching data for {ticker}...")
-            data = yf.download(ticker, start=start_date, end=end_date, progress=False)
-            
-            if not data.empty:
-                if len(data) < 50:  # Minimum required for technical indicators
-                    print(f"Warning: {ticker} has insufficient data ({len(data)} rows). Minimum 50 required.")
-                    continue
-                
-                # Check available columns and handle column name differences
-                print(f"Available columns for {ticker}: {list(data.columns)}")
-                
-                # Handle different column names - yfinance might use 'Close' instead of 'Adj Close'
-                if 'Adj Close' not in data.columns and 'Close' in data.columns:
-                    data['Adj Close'] = data['Close']
-                    print(f"Using 'Close' as 'Adj Close' for {ticker}")
-                
-                stock_data[ticker] = data
-                print(f"Successfully fetched data for {ticker} ({len(data)} rows)")
-            else:
-                print(f"No data found for {ticker} for the given date range.")
-        except Exception as e:
-            print(f"Could not fetch data for {ticker}: {e}")
-    
+
+    try:
+        asyncio.get_running_loop()
+        loop_running = True
+    except RuntimeError:
+        loop_running = False
+
+    if loop_running:  # e.g. Jupyter, where asyncio.run cannot be called, so use a fresh loop in a thread
+        with ThreadPoolExecutor(max_workers=1) as runner:
+            stock_data, failures = runner.submit(
+                asyncio.run, fetch_data_async(tickers, start_date, end_date)
+            ).result()
+    else:
+        stock_data, failures = asyncio.run(fetch_data_async(tickers, start_date, end_date))
+
+    for ticker, error in failures.items():
+        print(f"Could not fetch data for {ticker} after {FETCH_MAX_RETRIES + 1} attempts: {error}")
+    if failures:
+        print(f"Warning: {len(failures)} of {len(tickers)} tickers failed to fetch: {', '.join(failures)}")
+
     if not stock_data:
         print("Warning: No data was successfully fetched for any ticker.")
-    
-    return stock_data
\ No newline at end of file
+
+    return stock_data
+
+def load_universe(path: str) -> list:
+    """
+    Reads the list of tickers to scan from a file.
+
+    Args:
+        path (str): Text file with one ticker per line, or a CSV whose first column is the
+            ticker. Blank lines, '#' comments and a 'Ticker'/'Symbol' header are skipped.
+
+    Returns:
+        list: Unique tickers in file order, or an empty list if the file can't be read.
+    """
+    try:
+        with open(path, 'r') as f:
+            lines = f.readlines()
+    except OSError as e:
+        print(f"Error: Could not read universe file {path}: {e}")
+        return []
+
+    tickers = []
+    for line in lines:
+        ticker = line.split('#', 1)[0].split(',', 1)[0].strip()
+        if ticker and ticker.lower() not in ('ticker', 'symbol'):
+            tickers.append(ticker)
+    return list(dict.fromkeys(tickers))
+
+def iter_data_chunks(tickers: list, start_date: str, end_date: str, chunk_size: int = SCAN_CHUNK_SIZE):
+    """
+    Fetches tickers chunk by chunk, yielding each chunk's data as soon as it is ready.
+
+    Only one chunk is held at a time, so callers that release each chunk before
+    asking for the next keep memory flat regardless of the universe size.
+
+    Yields:
+        dict: Ticker to DataFrame for one chunk, as returned by fetch_data.
+    """
+    step = max(chunk_size, 1)
+    for i in range(0, len(tickers), step):
+        yield fetch_data(tickers[i:i + step], start_date, end_date)
@@ -0,0 +1,294 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import subprocess
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import DIST_BROKER_DIR, DIST_WORKERS, DIST_SHARD_SIZE, DIST_LEASE_SECONDS, DIST_SCAN_TIMEOUT
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+TRADE_DATE_FIELDS = ("buy_date", "sell_date")
+
+def _to_json(value):
+    """json.dumps fallback for the timestamps and numpy scalars in shard results."""
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__} in a shard result")
+
+def _restore_trade_dates(result: dict) -> dict:
+    """Turns the ISO trade dates of a loaded shard result back into Timestamps."""
+    for trades in result.get("all_trades", {}).values():
+        for trade in trades:
+            for field in TRADE_DATE_FIELDS:
+                if field in trade:
+                    trade[field] = pd.Timestamp(trade[field])
+    return result
+
+class FileBroker:
+    """
+    Shard queue kept in a directory, so any process that can see the directory
+    (on this host, or on other nodes over a shared filesystem) can act as a worker.
+
+    A shard moves pending/ -> leased/ -> results/. Claiming is an atomic rename,
+    so exactly one worker gets each shard. A worker keeps its lease alive by
+    touching the leased file; if it dies, the lease goes stale and the
+    coordinator moves the shard back to pending/ for another worker.
+    """
+
+    def __init__(self, root: str = DIST_BROKER_DIR):
+        self.root = root
+        self.pending = os.path.join(root, "pending")
+        self.leased = os.path.join(root, "leased")
+        self.results = os.path.join(root, "results")
+        for path in (self.pending, self.leased, self.results):
+            os.makedirs(path, exist_ok=True)
+
+    def _write_atomic(self, path: str, payload: bytes):
+        """Writes to a temporary file and renames it, so readers never see a partial file."""
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def submit(self, shard_id: str, job: dict):
+        """Queues a shard for any worker to pick up."""
+        self._write_atomic(os.path.join(self.pending, f"{shard_id}.json"), json.dumps(job).encode())
+
+    def claim(self):
+        """
+        Takes the oldest pending shard, if any.
+
+        Returns:
+            tuple: (shard_id, job dict), or (None, None) when the queue is empty.
+        """
+        for name in sorted(os.listdir(self.pending)):
+            if not name.endswith(".json"):
+                continue
+            pending_path = os.path.join(self.pending, name)
+            leased_path = os.path.join(self.leased, name)
+            try:
+                # Start the lease before the rename (which keeps the mtime), so the
+                # coordinator never sees a freshly claimed shard as already expired
+                os.utime(pending_path)
+                os.rename(pending_path, leased_path)
+                with open(leased_path, "r") as f:
+                    return name[:-len(".json")], json.load(f)
+            except FileNotFoundError:  # Another worker got it first, or it was requeued meanwhile
+                continue
+        return None, None
+
+    def heartbeat(self, shard_id: str):
+        """Renews the lease on a shard that is still being processed."""
+        try:
+            os.utime(os.path.join(self.leased, f"{shard_id}.json"))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, shard_id: str, result: dict):
+        """Stores a shard's result and releases its lease, unless the coordinator no longer wants it."""
+        leased_path = os.path.join(self.leased, f"{shard_id}.json")
+        if not (os.path.exists(leased_path) or os.path.exists(os.path.join(self.pending, f"{shard_id}.json"))):
+            return  # Another worker's result was already taken, or the scan gave up on the shard
+        # Results are plain JSON, never pickle, so a shared directory can't be used to run code on the coordinator
+        self._write_atomic(os.path.join(self.results, f"{shard_id}.json"),
+                           json.dumps(result, default=_to_json).encode())
+        try:
+            os.remove(leased_path)
+        except FileNotFoundError:  # Lease already expired and the shard was requeued
+            pass
+
+    def requeue_expired(self, lease_seconds: float) -> list:
+        """Moves shards whose lease has not been renewed in lease_seconds back to pending. Returns their ids."""
+        requeued = []
+        now = time.time()
+        for name in os.listdir(self.leased):
+            path = os.path.join(self.leased, name)
+            try:
+                if now - os.path.getmtime(path) > lease_seconds:
+                    os.rename(path, os.path.join(self.pending, name))
+                    requeued.append(name[:-len(".json")])
+            except FileNotFoundError:  # Completed in the meantime
+                continue
+        return requeued
+
+    def take_result(self, shard_id: str):
+        """Returns and removes a shard's result, or None if it isn't ready. Drops any leftover copies of the shard."""
+        path = os.path.join(self.results, f"{shard_id}.json")
+        try:
+            with open(path, "r") as f:
+                result = _restore_trade_dates(json.load(f))
+        except FileNotFoundError:
+            return None
+        for leftover in (path,
+                         os.path.join(self.pending, f"{shard_id}.json"),
+                         os.path.join(self.leased, f"{shard_id}.json")):
+            try:
+                os.remove(leftover)
+            except FileNotFoundError:
+                pass
+        return result
+
+    def discard_results(self, prefix: str):
+        """Removes results of shards starting with prefix, e.g. ones finished by late workers after a scan ended."""
+        for name in os.listdir(self.results):
+            if name.startswith(prefix):
+                try:
+                    os.remove(os.path.join(self.results, name))
+                except FileNotFoundError:
+                    pass
+
+def _keep_lease_alive(broker: FileBroker, shard_id: str, done: threading.Event, lease_seconds: float):
+    """Renews a lease a few times per lease period until the shard is finished."""
+    while not done.wait(lease_seconds / 3):
+        broker.heartbeat(shard_id)
+
+def run_worker(analyze, broker_dir: str = DIST_BROKER_DIR, lease_seconds: float = DIST_LEASE_SECONDS,
+               idle_exit_seconds: float = None):
+    """
+    Pulls shards from the broker and processes them until stopped.
+
+    Args:
+        analyze (callable): Takes a stock_data dict and returns (all_trades, ml_results),
+            i.e. main.analyze_stocks.
+        broker_dir (str): Broker directory shared with the coordinator.
+        lease_seconds (float): Lease period; heartbeats are sent three times per period.
+        idle_exit_seconds (float, optional): Exit after this long with no work. Runs forever if None.
+    """
+    import data_handler
+
+    broker = FileBroker(broker_dir)
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"👷 Worker {worker_id} polling {broker_dir}")
+    idle_since = time.time()
+
+    while True:
+        shard_id, job = broker.claim()
+        if shard_id is None:
+            if idle_exit_seconds is not None and time.time() - idle_since > idle_exit_seconds:
+                print(f"👷 Worker {worker_id} idle, exiting")
+                return
+            time.sleep(1)
+            continue
+
+        print(f"👷 Worker {worker_id} processing shard {shard_id} ({len(job['tickers'])} tickers)")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=_keep_lease_alive, args=(broker, shard_id, done, lease_seconds), daemon=True)
+        heartbeat.start()
+        try:
+            stock_data = data_handler.fetch_data(job['tickers'], job['start_date'], job['end_date'])
+            all_trades, ml_results = analyze(stock_data)
+            result = {
+                "worker": worker_id,
+                "all_trades": all_trades,
+                "ml_results": ml_results,
+                "analyzed": list(stock_data),
+                "failed": [ticker for ticker in job['tickers'] if ticker not in stock_data],
+            }
+        except Exception as e:
+            # Report the failure instead of letting the lease expire and retrying a shard that can't succeed
+            print(f"❌ Worker {worker_id} failed shard {shard_id}: {e}")
+            result = {"worker": worker_id, "all_trades": {}, "ml_results": [], "analyzed": [],
+                      "failed": list(job['tickers']), "error": str(e)}
+        finally:
+            done.set()
+        broker.complete(shard_id, result)
+        idle_since = time.time()
+
+def spawn_local_workers(count: int, broker_dir: str) -> list:
+    """Starts worker processes on this host running `main.py --worker`."""
+    return [
+        subprocess.Popen([sys.executable, MAIN_SCRIPT, "--worker", broker_dir])
+        for _ in range(count)
+    ]
+
+def run_coordinator(tickers: list, start_date: str, end_date: str, shard_size: int = DIST_SHARD_SIZE,
+                    local_workers: int = DIST_WORKERS, broker_dir: str = DIST_BROKER_DIR,
+                    lease_seconds: float = DIST_LEASE_SECONDS, timeout: float = DIST_SCAN_TIMEOUT):
+    """
+    Shards the universe onto the broker, waits for workers to process every shard and merges the results.
+
+    Workers may be the local processes started here and/or workers on other nodes sharing
+    broker_dir. Shards held by a worker that dies are requeued once their lease expires,
+    and dead local workers are restarted while work remains.
+
+    Returns:
+        tuple: (all_trades dict, ml_results list, number of stocks analyzed, list of tickers not analyzed)
+    """
+    broker = FileBroker(broker_dir)
+    scan_token = uuid.uuid4().hex[:8]
+    step = max(shard_size, 1)
+    shard_ids = []
+    for index, i in enumerate(range(0, len(tickers), step)):
+        shard_id = f"{scan_token}-{index:05d}"
+        broker.submit(shard_id, {"tickers": tickers[i:i + step], "start_date": start_date, "end_date": end_date})
+        shard_ids.append(shard_id)
+    print(f"📦 Queued {len(shard_ids)} shards of up to {step} tickers in {broker_dir}")
+
+    workers = spawn_local_workers(local_workers, broker_dir)
+    all_trades = {}
+    ml_results = []
+    analyzed = 0
+    failed = []
+    remaining = set(shard_ids)
+    deadline = time.time() + timeout
+
+    try:
+        while remaining and time.time() < deadline:
+            for shard_id in sorted(remaining):
+                result = broker.take_result(shard_id)
+                if result is None:
+                    continue
+                remaining.discard(shard_id)
+                all_trades.update(result['all_trades'])
+                ml_results.extend(result['ml_results'])
+                analyzed += len(result['analyzed'])
+                failed.extend(result['failed'])
+                print(f"📥 Shard {shard_id} done by {result['worker']} ({len(shard_ids) - len(remaining)}/{len(shard_ids)})")
+
+            for shard_id in broker.requeue_expired(lease_seconds):
+                print(f"⚠️  Lease on shard {shard_id} expired, requeued for another worker")
+
+            for i, worker in enumerate(workers):
+                if worker.poll() is not None and remaining:
+                    print(f"⚠️  Local worker {worker.pid} exited with code {worker.returncode}, restarting")
+                    workers[i] = spawn_local_workers(1, broker_dir)[0]
+
+            if remaining:
+                time.sleep(0.5)
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.terminate()
+        for worker in workers:
+            try:
+                worker.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+        broker.discard_results(scan_token)
+
+    if remaining:
+        print(f"❌ {len(remaining)} shards did not finish within {timeout:.0f}s: {', '.join(sorted(remaining))}")
+        for shard_id in remaining:
+            for folder in (broker.pending, broker.leased):
+                path = os.path.join(folder, f"{shard_id}.json")
+                try:
+                    with open(path, "r") as f:
+                        failed.extend(json.load(f)['tickers'])
+                    os.remove(path)
+                    break
+                except (FileNotFoundError, KeyError, ValueError):
+                    continue
+
+    # Shards finish in any order; report results in universe order
+    order = {ticker: i for i, ticker in enumerate(tickers)}
+    all_trades = dict(sorted(all_trades.items(), key=lambda item: order.get(item[0], len(order))))
+    ml_results.sort(key=lambda result: order.get(result['Ticker'], len(order)))
+    return all_trades, ml_results, analyzed, failed
@@ -0,0 +1,149 @@
+# indicators.py
+import pandas as pd
+import numpy as np
+
+import kernels
+from config import RSI_METHOD
+
+PANEL_INDICATORS = ['RSI_14', 'SMA_20', 'SMA_50', 'MACD_12_26_9']
+
+def build_price_panel(stock_data: dict) -> pd.DataFrame:
+    """
+    Aligns the price column of every ticker into one wide (time x ticker) DataFrame.
+
+    Args:
+        stock_data (dict): Mapping of ticker to its OHLCV DataFrame, as returned by fetch_data.
+
+    Returns:
+        pd.DataFrame: Prices indexed by date with one column per ticker. Dates missing
+        for a ticker are NaN in its column.
+    """
+    columns = {}
+    for ticker, df in stock_data.items():
+        price_column = 'Adj Close' if 'Adj Close' in df.columns else 'Close'
+        if price_column not in df.columns:
+            print(f"Error: No price column found for {ticker}. Available columns: {list(df.columns)}")
+            continue
+
+        prices = df[price_column]
+        if isinstance(prices, pd.DataFrame):  # yfinance may return (field, ticker) columns
+            prices = prices.iloc[:, 0]
+        columns[ticker] = prices.astype(float)
+
+    panel = pd.DataFrame(columns).sort_index()
+    panel.index.name = 'Date'
+    return panel
+
+def panel_rsi(values: np.ndarray, period: int = 14, method: str = RSI_METHOD) -> np.ndarray:
+    """RSI for every column, using the kernel selected by method ('simple' or 'wilder')."""
+    return kernels.get_kernel(f"rsi_{method}")(values, period)
+
+def panel_macd(values: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD line, signal line and histogram for every column."""
+    macd_line = kernels.ema(values, fast) - kernels.ema(values, slow)
+    signal_line = kernels.ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+def _compact_columns(values: np.ndarray):
+    """
+    Moves each column's valid prices to the top, keeping their order.
+
+    Returns:
+        tuple: (compacted array, row order used, mask of valid prices in values)
+    """
+    valid = ~np.isnan(values)
+    order = np.argsort(~valid, axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), order, valid
+
+def _expand_columns(compacted: np.ndarray, order: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Puts compacted results back on their original rows, NaN wherever the price is missing."""
+    out = np.empty_like(compacted)
+    np.put_along_axis(out, order, compacted, axis=0)
+    out[~valid] = np.nan
+    return out
+
+def compute_indicators(values: np.ndarray, names) -> dict:
+    """
+    Computes indicators by name on a price series (1-D) or panel (2-D).
+
+    Names follow the pandas-ta style already used for DataFrame columns:
+    'RSI_14', 'SMA_20', 'EMA_12', and 'MACD_12_26_9' with its signal line
+    'MACDs_12_26_9' and histogram 'MACDh_12_26_9'.
+
+    Each panel column is computed over its own trading days only, so a ticker
+    with dates missing from the middle of the panel gets the same values as
+    when it is computed on its own.
+
+    Args:
+        values (np.ndarray): Prices, time along axis 0.
+        names (iterable): Indicator names. Each is computed once even if repeated.
+
+    Returns:
+        dict: Maps each name to an array shaped like values.
+    """
+    if np.ndim(values) == 2:
+        compacted, order, valid = _compact_columns(np.asarray(values, dtype=float))
+        results = _compute_indicators(compacted, names)
+        return {name: _expand_columns(array, order, valid) for name, array in results.items()}
+    return _compute_indicators(values, names)
+
+def _compute_indicators(values: np.ndarray, names) -> dict:
+    """Computes indicators on values as given; see compute_indicators."""
+    results = {}
+    macd_cache = {}
+    for name in names:
+        if name in results:
+            continue
+        kind, _, params = name.partition('_')
+        try:
+            periods = [int(p) for p in params.split('_')]
+        except ValueError:
+            raise ValueError(f"Invalid indicator name '{name}'")
+
+        if kind == 'RSI' and len(periods) == 1:
+            results[name] = panel_rsi(values, periods[0])
+        elif kind == 'SMA' and len(periods) == 1:
+            results[name] = kernels.sma(values, periods[0])
+        elif kind == 'EMA' and len(periods) == 1:
+            results[name] = kernels.ema(values, periods[0])
+        elif kind in ('MACD', 'MACDs', 'MACDh') and len(periods) == 3:
+            key = tuple(periods)
+            if key not in macd_cache:
+                macd_cache[key] = panel_macd(values, *periods)
+            results[name] = macd_cache[key][('MACD', 'MACDs', 'MACDh').index(kind)]
+        else:
+            raise ValueError(f"Unknown indicator '{name}'")
+    return results
+
+def compute_panel_indicators(panel: pd.DataFrame, names=PANEL_INDICATORS) -> dict:
+    """
+    Computes indicators for every ticker in a price panel in one vectorized pass.
+
+    Args:
+        panel (pd.DataFrame): Wide price panel from build_price_panel.
+        names (iterable, optional): Indicator names, see compute_indicators. Defaults to PANEL_INDICATORS.
+
+    Returns:
+        dict: Maps 'price' and each indicator name to a (time x ticker) DataFrame.
+    """
+    values = panel.to_numpy(dtype=float)
+    results = {'price': values}
+    results.update(compute_indicators(values, names))
+    return {
+        name: pd.DataFrame(array, index=panel.index, columns=panel.columns)
+        for name, array in results.items()
+    }
+
+def ticker_view(panel_indicators: dict, ticker: str) -> pd.DataFrame:
+    """
+    Slices one ticker's indicators out of the panel.
+
+    Args:
+        panel_indicators (dict): Output of compute_panel_indicators.
+        ticker (str): Ticker to extract.
+
+    Returns:
+        pd.DataFrame: One column per indicator, restricted to dates the ticker traded.
+    """
+    view = pd.DataFrame({name: frame[ticker] for name, frame in panel_indicators.items()})
+    return view[view['price'].notna()]
@@ -0,0 +1,151 @@
+# kernels.py
+import numpy as np
+import pandas as pd
+
+# All kernels work down axis 0, so they accept a single price series (1-D) or a
+# (time x ticker) panel (2-D). NaN marks a missing price and never poisons the
+# rest of a column: a value is produced once a full window of valid inputs exists.
+
+def _as_2d(values) -> np.ndarray:
+    """Views the input as a float (time x column) array without copying when possible."""
+    array = np.asarray(values, dtype=float)
+    return array.reshape(-1, 1) if array.ndim == 1 else array
+
+def _shape_like(result: np.ndarray, values) -> np.ndarray:
+    """Returns a 1-D result for 1-D input."""
+    return result.ravel() if np.ndim(values) == 1 else result
+
+def sma(values, period: int) -> np.ndarray:
+    """
+    O(n) rolling mean, equivalent to pandas' rolling(window=period).mean().
+
+    Each column is shifted by its first valid value before the cumulative sum,
+    which keeps the running total small and the window differences accurate
+    for long price histories.
+    """
+    array = _as_2d(values)
+    rows, cols = array.shape
+    valid = ~np.isnan(array)
+
+    first = np.argmax(valid, axis=0)
+    offset = np.where(valid.any(axis=0), array[first, np.arange(cols)], 0.0)
+
+    csum = np.zeros((rows + 1, cols))
+    np.subtract(array, offset, out=csum[1:])
+    csum[1:][~valid] = 0.0
+    np.cumsum(csum[1:], axis=0, out=csum[1:])
+    ccount = np.zeros((rows + 1, cols), dtype=np.int64)
+    np.cumsum(valid, axis=0, out=ccount[1:])
+
+    out = np.full((rows, cols), np.nan)
+    if rows >= period:
+        window = out[period - 1:]
+        np.subtract(csum[period:], csum[:-period], out=window)
+        window /= period
+        window += offset
+        window[ccount[period:] - ccount[:-period] != period] = np.nan
+    return _shape_like(out, values)
+
+def ema(values, span: int) -> np.ndarray:
+    """
+    Adjusted exponential moving average, equivalent to pandas' ewm(span=span).mean().
+
+    Runs on pandas' compiled ewm, one O(n) pass per column with no Python-level loop.
+    """
+    array = _as_2d(values)
+    out = pd.DataFrame(array).ewm(span=span).mean().to_numpy(copy=True)
+    return _shape_like(out, values)
+
+def _gains_losses(array: np.ndarray):
+    """Splits price changes into gains and losses; NaN only where the price itself is missing."""
+    gains = np.zeros(array.shape)
+    np.subtract(array[1:], array[:-1], out=gains[1:])
+    losses = np.negative(gains)
+    # A change from a missing price counts as zero, like Series.where(delta > 0, 0)
+    np.maximum(gains, 0.0, out=gains, where=~np.isnan(gains))
+    np.maximum(losses, 0.0, out=losses, where=~np.isnan(losses))
+    np.nan_to_num(gains, copy=False, nan=0.0)
+    np.nan_to_num(losses, copy=False, nan=0.0)
+    missing = np.isnan(array)
+    gains[missing] = np.nan
+    losses[missing] = np.nan
+    return gains, losses
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    """Turns average gain/loss into RSI in place: 100 - 100 / (1 + gain / loss)."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(avg_gain, avg_loss, out=avg_gain)
+        avg_gain += 1.0
+        np.divide(100.0, avg_gain, out=avg_gain)
+        np.subtract(100.0, avg_gain, out=avg_gain)
+    return avg_gain
+
+def rsi_simple(values, period: int = 14) -> np.ndarray:
+    """RSI from simple rolling averages of gains and losses (the original calculate_rsi)."""
+    array = _as_2d(values)
+    gains, losses = _gains_losses(array)
+    out = _rsi_from_averages(sma(gains, period), sma(losses, period))
+    return _shape_like(out, values)
+
+def _wilder_average(changes: np.ndarray, changed: np.ndarray, seen: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder-smoothed average of the changes in each column, NaN during warm-up and where there was no change.
+
+    The seed (the mean of the first `period` changes) is placed on the row where the
+    column reaches `period` changes, and pandas' compiled ewm with alpha = 1 / period
+    and adjust=False carries the recursion from there, skipping rows without a change.
+    """
+    seeded = seen == period
+    seed_rows = np.argmax(seeded & changed, axis=0)
+    has_seed = (seeded & changed).any(axis=0)
+    cols = np.flatnonzero(has_seed)
+
+    sums = np.cumsum(np.where(changed, changes, 0.0), axis=0)
+    series = np.where(changed & (seen > period), changes, np.nan)
+    series[seed_rows[cols], cols] = sums[seed_rows[cols], cols] / period
+
+    averaged = pd.DataFrame(series).ewm(alpha=1.0 / period, adjust=False, ignore_na=True).mean().to_numpy(copy=True)
+    averaged[~changed | (seen < period)] = np.nan
+    return averaged
+
+def rsi_wilder(values, period: int = 14) -> np.ndarray:
+    """
+    RSI with Wilder's smoothing.
+
+    The first average is the simple mean of the first `period` price changes;
+    after that avg = (prev_avg * (period - 1) + change) / period.
+    """
+    array = _as_2d(values)
+    gains, losses = _gains_losses(array)
+
+    # A change needs a price on both this row and the previous one
+    changed = np.zeros(array.shape, dtype=bool)
+    changed[1:] = ~np.isnan(array[1:]) & ~np.isnan(array[:-1])
+    seen = np.cumsum(changed, axis=0)
+
+    out = _rsi_from_averages(_wilder_average(gains, changed, seen, period),
+                             _wilder_average(losses, changed, seen, period))
+    return _shape_like(out, values)
+
+KERNELS = {
+    'sma': sma,
+    'ema': ema,
+    'rsi': rsi_simple,
+    'rsi_simple': rsi_simple,
+    'rsi_wilder': rsi_wilder,
+}
+
+def get_kernel(name: str):
+    """
+    Looks up an indicator kernel by name.
+
+    Args:
+        name (str): One of the keys in KERNELS, e.g. 'sma', 'ema', 'rsi_wilder'.
+
+    Returns:
+        callable: The kernel function.
+    """
+    try:
+        return KERNELS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown indicator kernel '{name}'. Available: {sorted(KERNELS)}")
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 import schedule
 import time
 import os
+import gc
 from dotenv import load_dotenv
 
 # Import project modules
@@ -10,9 +11,13 @@ import strategy
 import sheets_manager
 import ml_model
 import alerter
+import indicators
+import trade_store
+import distributed
 
 # Import variables from config file
-from config import TICKERS, BACKTEST_MONTHS
+from config import (TICKERS, BACKTEST_MONTHS, PANEL_MODE, STRATEGIES,
+                    UNIVERSE_FILE, SCAN_CHUNK_SIZE, STREAMING_SCAN, TRADE_DB_PATH, DIST_BROKER_DIR)
 
 # Load environment variables
 load_dotenv()
@@ -58,43 +63,45 @@ def check_setups():
     
     return telegram_enabled, sheets_enabled
 
-def run_automated_scan():
-    """Auto-triggered function to scan data, run strategy, and log output."""
-    print("--- Starting Automated Scan ---")
-    
-    # Check setups
-    telegram_enabled, sheets_enabled = check_setups()
-    
-    # Send startup notification
-    if telegram_enabled:
-        startup_msg = f"🚀 Stock Trading Bot Started\n📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n📊 Analyzing {len(TICKERS)} stocks"
-        send_telegram_alert(startup_msg)
+def get_universe() -> list:
+    """Returns the tickers to scan: the UNIVERSE_FILE list when configured, otherwise TICKERS."""
+    if UNIVERSE_FILE:
+        tickers = data_handler.load_universe(UNIVERSE_FILE)
+        if tickers:
+            return tickers
+        print(f"⚠️  No tickers loaded from {UNIVERSE_FILE}, falling back to TICKERS")
+    return TICKERS
 
-    # Calculate date range
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=BACKTEST_MONTHS * 30)
+def analyze_stocks(stock_data: dict):
+    """
+    Runs the strategies and ML model on every fetched stock.
 
-    # Fetch stock data
-    stock_data = data_handler.fetch_data(
-        TICKERS,
-        start_date.strftime('%Y-%m-%d'),
-        end_date.strftime('%Y-%m-%d')
-    )
-
-    if not stock_data:
-        print("❌ No stock data available. Exiting.")
-        return
+    Returns:
+        tuple: (all_trades dict keyed by ticker, ml_results list)
+    """
+    # In panel mode, compute indicators for every ticker in one vectorized pass
+    panel_indicators = None
+    if PANEL_MODE:
+        print(f"Computing indicators on a {len(stock_data)}-ticker panel...")
+        panel_indicators = indicators.compute_panel_indicators(
+            indicators.build_price_panel(stock_data),
+            indicators.PANEL_INDICATORS + strategy.required_indicators(STRATEGIES)
+        )
 
     all_trades = {}
     ml_results = []
-    alerts_sent = 0
 
     # Analyze each stock
     for ticker, data in stock_data.items():
         print(f"\n--- Analyzing {ticker} ---")
 
-        # Run trading strategy
-        trades = strategy.apply_trading_strategy(data.copy())
+        panel_view = None
+        if panel_indicators is not None and ticker in panel_indicators['price'].columns:
+            panel_view = indicators.ticker_view(panel_indicators, ticker)
+
+        # Run every configured strategy over one shared set of indicators
+        strategy_trades = strategy.run_strategies(data.copy(), STRATEGIES, panel_view)
+        trades = [dict(trade, strategy=name) for name, found in strategy_trades.items() for trade in found]
         if trades:
             all_trades[ticker] = trades
             print(f"Found {len(trades)} potential trades for {ticker}.")
@@ -103,29 +110,42 @@ def run_automated_scan():
             for i, trade in enumerate(trades):
                 if 'sell_price' in trade:
                     pnl = trade['sell_price'] - trade['buy_price']
-                    print(f"  Trade {i+1}: Buy at {trade['buy_price']:.2f} on {trade['buy_date'].strftime('%Y-%m-%d')}")
+                    print(f"  Trade {i+1} [{trade['strategy']}]: Buy at {trade['buy_price']:.2f} on {trade['buy_date'].strftime('%Y-%m-%d')}")
                     print(f"           Sell at {trade['sell_price']:.2f} on {trade['sell_date'].strftime('%Y-%m-%d')}")
                     print(f"           P&L: {pnl:.2f}")
                 else:
-                    print(f"  Trade {i+1}: Buy at {trade['buy_price']:.2f} on {trade['buy_date'].strftime('%Y-%m-%d')} (Open position)")
-            
-            # Send alert for latest buy signal
-            latest_buy = next((t for t in reversed(trades) if 'sell_price' not in t), None)
-            if latest_buy:
-                alert_msg = f"🚨 *{ticker}* Buy Signal Alert!\n💰 Buy Price: ₹{latest_buy['buy_price']:.2f}\n📅 Date: {latest_buy['buy_date'].strftime('%Y-%m-%d')}\n⏰ Time: {datetime.now().strftime('%H:%M:%S')}"
-                
-                if telegram_enabled:
-                    send_telegram_alert(alert_msg)
-                    alerts_sent += 1
-                else:
-                    print(f"\n📱 TELEGRAM ALERT (Demo):")
-                    print(f"   {alert_msg}")
+                    print(f"  Trade {i+1} [{trade['strategy']}]: Buy at {trade['buy_price']:.2f} on {trade['buy_date'].strftime('%Y-%m-%d')} (Open position)")
 
         # Run ML model
-        accuracy = ml_model.train_and_predict(data.copy())
+        accuracy = ml_model.train_and_predict(data.copy(), panel_view)
         ml_results.append({"Ticker": ticker, "Prediction Accuracy (%)": f"{accuracy:.2f}"})
         print(f"ML Model Prediction Accuracy for {ticker}: {accuracy:.2f}%")
 
+    return all_trades, ml_results
+
+def send_buy_alerts(all_trades: dict, telegram_enabled: bool) -> int:
+    """Sends an alert for each ticker and strategy whose latest trade is still an open buy. Returns the number sent."""
+    alerts_sent = 0
+    for ticker, trades in all_trades.items():
+        latest_by_strategy = {}
+        for trade in trades:
+            latest_by_strategy[trade.get('strategy')] = trade
+
+        for name, latest_buy in latest_by_strategy.items():
+            if 'sell_price' in latest_buy:
+                continue
+            alert_msg = f"🚨 *{ticker}* Buy Signal Alert!\n📈 Strategy: {name}\n💰 Buy Price: ₹{latest_buy['buy_price']:.2f}\n📅 Date: {latest_buy['buy_date'].strftime('%Y-%m-%d')}\n⏰ Time: {datetime.now().strftime('%H:%M:%S')}"
+            
+            if telegram_enabled:
+                send_telegram_alert(alert_msg)
+                alerts_sent += 1
+            else:
+                print(f"\n📱 TELEGRAM ALERT (Demo):")
+                print(f"   {alert_msg}")
+    return alerts_sent
+
+def log_results(all_trades: dict, ml_results: list, sheets_enabled: bool):
+    """Logs a full scan's trades and ML results to Google Sheets, or prints them in demo mode."""
     # Log to Google Sheets
     if all_trades and sheets_enabled:
         print(f"\n📊 Logging to Google Sheets...")
@@ -155,9 +175,164 @@ def run_automated_scan():
         for result in ml_results:
             print(f"     {result['Ticker']}: {result['Prediction Accuracy (%)']}% accuracy")
 
+def run_streaming_scan(tickers: list, start_date: str, end_date: str, telegram_enabled: bool, sheets_enabled: bool,
+                       store=None, scan_id: int = None):
+    """
+    Scans the universe SCAN_CHUNK_SIZE tickers at a time. Each chunk is fetched,
+    analyzed and written to the sinks before the next one is loaded, so memory
+    stays flat however many tickers are scanned.
+
+    Returns:
+        tuple: (number of stocks analyzed, number of alerts sent)
+    """
+    sheet = sheets_manager.connect_to_sheet() if sheets_enabled else None
+    if sheet:
+        sheets_manager.start_scan_log(sheet)
+    else:
+        print(f"\n GOOGLE SHEETS LOG (Demo): results are printed as each chunk completes")
+
+    analyzed = 0
+    alerts_sent = 0
+    total_trades = 0
+    completed_trades = []
+
+    chunks = data_handler.iter_data_chunks(tickers, start_date, end_date, SCAN_CHUNK_SIZE)
+    for chunk_number, stock_data in enumerate(chunks, start=1):
+        print(f"\n=== Chunk {chunk_number}: {len(stock_data)} stocks ===")
+        all_trades, ml_results = analyze_stocks(stock_data)
+        analyzed += len(stock_data)
+        alerts_sent += send_buy_alerts(all_trades, telegram_enabled)
+
+        trade_log_data = sheets_manager.trade_log_rows(all_trades)
+        total_trades += sum(len(trades) for trades in all_trades.values())
+        completed_trades.extend(row['P&L'] for row in trade_log_data)
+
+        # Write this chunk out before loading the next one
+        if store:
+            trade_store.record_results(store, scan_id, all_trades, ml_results)
+        if sheet:
+            sheets_manager.append_to_sheet(sheet, "Trade Log", trade_log_data)
+            sheets_manager.append_to_sheet(sheet, "ML Analytics", ml_results)
+        else:
+            for row in trade_log_data:
+                print(f"     {row['Ticker']} | Buy: {row['Buy Price']:.2f} | Sell: {row['Sell Price']:.2f} | P&L: {row['P&L']:.2f}")
+            for result in ml_results:
+                print(f"     {result['Ticker']}: {result['Prediction Accuracy (%)']}% accuracy")
+
+        del stock_data, all_trades, ml_results, trade_log_data
+        gc.collect()
+
+    if sheet:
+        sheets_manager.log_summary(sheet, completed_trades)
+    else:
+        print(f"   📈 Summary P&L:")
+        print(f"     Total Trades: {total_trades}")
+        print(f"     Completed Trades: {len(completed_trades)}")
+        print(f"     Total P&L: {sum(completed_trades):.2f}")
+
+    return analyzed, alerts_sent
+
+def run_distributed_scan(tickers: list, start_date: str, end_date: str, telegram_enabled: bool, sheets_enabled: bool,
+                         store=None, scan_id: int = None):
+    """
+    Shards the universe across worker processes, merges their trades and ML results,
+    then alerts and logs once for the whole scan.
+
+    Returns:
+        tuple: (number of stocks analyzed, number of alerts sent)
+    """
+    all_trades, ml_results, analyzed, failed = distributed.run_coordinator(tickers, start_date, end_date)
+    if failed:
+        print(f"⚠️  {len(failed)} tickers were not analyzed: {', '.join(failed)}")
+
+    if store:
+        trade_store.record_results(store, scan_id, all_trades, ml_results)
+    alerts_sent = send_buy_alerts(all_trades, telegram_enabled)
+    log_results(all_trades, ml_results, sheets_enabled)
+    return analyzed, alerts_sent
+
+def run_automated_scan(streaming: bool = STREAMING_SCAN, distributed_scan: bool = False):
+    """Auto-triggered function to scan data, run strategy, and log output."""
+    print("--- Starting Automated Scan ---")
+    
+    # Check setups
+    telegram_enabled, sheets_enabled = check_setups()
+    tickers = get_universe()
+    
+    # Send startup notification
+    if telegram_enabled:
+        startup_msg = f"🚀 Stock Trading Bot Started\n📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n📊 Analyzing {len(tickers)} stocks"
+        send_telegram_alert(startup_msg)
+
+    # Calculate date range
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=BACKTEST_MONTHS * 30)
+
+    # Every scan is recorded in the local trade database; Sheets is an optional export
+    store = trade_store.connect_store()
+    mode = "distributed" if distributed_scan else "stream" if streaming else "batch"
+    scan_id = trade_store.start_scan(store, mode, len(tickers)) if store else None
+    if store and scan_id is None:
+        # The database is locked or read-only; scan and alert anyway, just without recording
+        store.close()
+        store = None
+
+    if distributed_scan:
+        analyzed, alerts_sent = run_distributed_scan(
+            tickers,
+            start_date.strftime('%Y-%m-%d'),
+            end_date.strftime('%Y-%m-%d'),
+            telegram_enabled,
+            sheets_enabled,
+            store,
+            scan_id
+        )
+        if not analyzed:
+            print("❌ No stock data available.")
+    elif streaming:
+        analyzed, alerts_sent = run_streaming_scan(
+            tickers,
+            start_date.strftime('%Y-%m-%d'),
+            end_date.strftime('%Y-%m-%d'),
+            telegram_enabled,
+            sheets_enabled,
+            store,
+            scan_id
+        )
+        if not analyzed:
+            print("❌ No stock data available.")
+    else:
+        # Fetch stock data
+        stock_data = data_handler.fetch_data(
+            tickers,
+            start_date.strftime('%Y-%m-%d'),
+            end_date.strftime('%Y-%m-%d')
+        )
+
+        if not stock_data:
+            print("❌ No stock data available. Exiting.")
+            if store:
+                trade_store.finish_scan(store, scan_id, 0, 0)
+                store.close()
+            return
+
+        all_trades, ml_results = analyze_stocks(stock_data)
+        alerts_sent = send_buy_alerts(all_trades, telegram_enabled)
+        if store:
+            trade_store.record_results(store, scan_id, all_trades, ml_results)
+        log_results(all_trades, ml_results, sheets_enabled)
+        analyzed = len(stock_data)
+
+    if store:
+        if trade_store.finish_scan(store, scan_id, analyzed, alerts_sent):
+            print(f"\n💾 Scan {scan_id} recorded in {TRADE_DB_PATH}")
+        if sheets_enabled:
+            sheets_manager.log_pnl_by_ticker(trade_store.pnl_by_ticker(store, scan_id))
+        store.close()
+
     # Send completion notification
     if telegram_enabled:
-        completion_msg = f"✅ Scan Complete\n📊 Analyzed {len(stock_data)} stocks\n🚨 Sent {alerts_sent} alerts\n⏰ {datetime.now().strftime('%H:%M:%S')}"
+        completion_msg = f"✅ Scan Complete\n📊 Analyzed {analyzed} stocks\n🚨 Sent {alerts_sent} alerts\n⏰ {datetime.now().strftime('%H:%M:%S')}"
         send_telegram_alert(completion_msg)
 
     print("\n--- Scan Complete ---")
@@ -186,7 +361,25 @@ def schedule_scans():
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) > 1 and sys.argv[1] == "--schedule":
+    if len(sys.argv) > 1 and sys.argv[1] == "--profile":
+        # Profile one scan; add --stream to profile a streaming scan instead
+        if "--coordinator" in sys.argv:
+            # The coordinator only waits on its workers, so a profile of it would show nothing useful
+            print("❌ --profile can't be combined with --coordinator: fetching and analysis run in the "
+                  "worker processes. Profile a batch or --stream scan instead.")
+            sys.exit(1)
+        import profiler
+        profiler.profile_scan(
+            lambda: run_automated_scan(streaming="--stream" in sys.argv or STREAMING_SCAN),
+            sampler_only="--sampler-only" in sys.argv
+        )
+    elif len(sys.argv) > 1 and sys.argv[1] == "--schedule":
         schedule_scans()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--stream":
+        run_automated_scan(streaming=True)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--coordinator":
+        run_automated_scan(distributed_scan=True)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        distributed.run_worker(analyze_stocks, sys.argv[2] if len(sys.argv) > 2 else DIST_BROKER_DIR)
     else:
         run_automated_scan()
\ No newline at end of file
@@ -5,30 +5,32 @@ from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 
+import kernels
+from config import RSI_METHOD
+
 def calculate_macd(prices, fast=12, slow=26, signal=9):
     """Calculate MACD manually to avoid pandas-ta dependency issues."""
-    ema_fast = prices.ewm(span=fast).mean()
-    ema_slow = prices.ewm(span=slow).mean()
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal).mean()
+    values = prices.to_numpy(dtype=float)
+    macd_line = kernels.ema(values, fast) - kernels.ema(values, slow)
+    signal_line = kernels.ema(macd_line, signal)
     histogram = macd_line - signal_line
-    return macd_line, signal_line, histogram
+    return (pd.Series(macd_line, index=prices.index),
+            pd.Series(signal_line, index=prices.index),
+            pd.Series(histogram, index=prices.index))
 
-def calculate_rsi(prices, period=14):
-    """Calculate RSI manually."""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+def calculate_rsi(prices, period=14, method=RSI_METHOD):
+    """Calculate RSI manually ('simple' or 'wilder' smoothing)."""
+    rsi = kernels.get_kernel(f"rsi_{method}")(prices.to_numpy(dtype=float), period)
+    return pd.Series(rsi, index=prices.index)
 
-def train_and_predict(df: pd.DataFrame) -> float:
+def train_and_predict(df: pd.DataFrame, panel_view: pd.DataFrame = None) -> float:
     """
     [cite_start]Trains a basic ML model (Logistic Regression) to predict next-day movement[cite: 16].
     
     Args:
         df (pd.DataFrame): DataFrame with stock data.
+        panel_view (pd.DataFrame, optional): Precomputed indicators for this ticker from
+            indicators.ticker_view. When given, they are used instead of recomputing.
 
     Returns:
         [cite_start]float: The prediction accuracy of the model[cite: 17].
@@ -46,9 +48,13 @@ def train_and_predict(df: pd.DataFrame) -> float:
         print(f"ML Model using '{price_column}' column for price data")
         
         # [cite_start]Feature Engineering: Use RSI, MACD, and Volume [cite: 16]
-        df['RSI_14'] = calculate_rsi(df[price_column], 14)
-        macd_line, signal_line, histogram = calculate_macd(df[price_column])
-        df['MACD_12_26_9'] = macd_line
+        if panel_view is not None:
+            df['RSI_14'] = panel_view['RSI_14']
+            df['MACD_12_26_9'] = panel_view['MACD_12_26_9']
+        else:
+            df['RSI_14'] = calculate_rsi(df[price_column], 14)
+            macd_line, signal_line, histogram = calculate_macd(df[price_column])
+            df['MACD_12_26_9'] = macd_line
         df['Volume'] = df['Volume']
         
         # Target Variable: 1 if next day's close is higher, 0 otherwise
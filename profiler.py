@@ -0,0 +1,231 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import functools
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from config import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL
+
+# Project modules whose functions appear in the hotspot table
+PROJECT_MODULES = {'main', 'data_handler', 'strategy', 'ml_model', 'indicators', 'kernels',
+                   'sheets_manager', 'trade_store', 'distributed', 'alerter'}
+
+# (module name, function name, stage label) wrapped to measure time and peak memory per stage
+STAGES = [
+    ('data_handler', 'fetch_data', 'fetch'),
+    ('indicators', 'compute_panel_indicators', 'panel indicators'),
+    ('strategy', 'run_strategies', 'strategy'),
+    ('ml_model', 'train_and_predict', 'ml model'),
+    ('sheets_manager', 'log_trades_and_pnl', 'sheets'),
+    ('sheets_manager', 'log_ml_analytics', 'sheets'),
+    ('sheets_manager', 'append_to_sheet', 'sheets'),
+    ('sheets_manager', 'log_summary', 'sheets'),
+    ('sheets_manager', 'log_pnl_by_ticker', 'sheets'),
+    ('trade_store', 'record_results', 'trade database'),
+    ('alerter', 'send_alert', 'alerts'),
+]
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads at a fixed interval and keeps them in the
+    folded format ("frame;frame;frame count") read by flamegraph.pl and speedscope.
+
+    Samples taken while main.analyze_stocks is on the stack are also counted
+    against the ticker it is analyzing, for the per-ticker hotspot report.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.ticker_samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._sample(names.get(thread_id, str(thread_id)), frame)
+
+    def _sample(self, thread_name: str, frame):
+        frames = []
+        ticker = None
+        while frame is not None:
+            code = frame.f_code
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            frames.append(f"{module}:{code.co_name}")
+            if code.co_name == 'analyze_stocks' and ticker is None:
+                ticker = frame.f_locals.get('ticker')
+            frame = frame.f_back
+        frames.append(thread_name)
+        self.stacks[';'.join(reversed(frames))] += 1
+        if ticker is not None:
+            self.ticker_samples[ticker] += 1
+
+    def write_folded(self, path: str):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+class StageTracker:
+    """Records wall time, call count and peak traced memory for each named stage of a scan."""
+
+    def __init__(self):
+        self.stats = {}
+        self._stack = []
+        self._lock = threading.Lock()
+
+    def wrap(self, label: str, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._enter(label)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit(label, time.perf_counter() - started)
+        return wrapper
+
+    def _enter(self, label: str):
+        with self._lock:
+            # tracemalloc has one global peak: fold it into the enclosing stage, then reset for this one
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._stack.append({'label': label, 'peak': 0})
+
+    def _exit(self, label: str, elapsed: float):
+        with self._lock:
+            frame = self._stack.pop()
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            stage = self.stats.setdefault(label, {'calls': 0, 'seconds': 0.0, 'peak': 0})
+            stage['calls'] += 1
+            stage['seconds'] += elapsed
+            stage['peak'] = max(stage['peak'], peak)
+
+def _instrument(tracker: StageTracker) -> list:
+    """Wraps every stage function in place. Returns what is needed to undo it."""
+    patched = []
+    for module_name, func_name, label in STAGES:
+        module = sys.modules.get(module_name)
+        if module is None or not hasattr(module, func_name):
+            continue
+        original = getattr(module, func_name)
+        setattr(module, func_name, tracker.wrap(label, original))
+        patched.append((module, func_name, original))
+    return patched
+
+def _hotspot_rows(profile: cProfile.Profile, limit: int) -> list:
+    """Ranks project functions by cumulative time."""
+    rows = []
+    for (filename, line, func_name), (_, calls, own, cumulative, _) in pstats.Stats(profile).stats.items():
+        module = os.path.splitext(os.path.basename(filename))[0]
+        if module in PROJECT_MODULES:
+            rows.append((cumulative, own, calls, f"{module}.{func_name}:{line}"))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+def _write_report(path: str, total_seconds: float, tracker: StageTracker, sampler: SamplingProfiler,
+                  profile: cProfile.Profile = None, limit: int = 25) -> str:
+    """Writes the text report. Without a cProfile run (sampler only) it has no memory or function columns."""
+    lines = [f"Scan profile — {total_seconds:.2f}s total"]
+    if profile is not None:
+        lines.append("Note: cProfile and tracemalloc ran alongside the sampler. Their overhead inflates "
+                     "Python-heavy and allocation-heavy code in the flame graph and stage times; "
+                     "rerun with --sampler-only for undistorted timings.")
+    lines.append("")
+
+    lines.append("Stages")
+    if profile is not None:
+        lines.append(f"  {'stage':<18}{'calls':>7}{'seconds':>10}{'peak MiB':>11}")
+    else:
+        lines.append(f"  {'stage':<18}{'calls':>7}{'seconds':>10}")
+    for label, stage in sorted(tracker.stats.items(), key=lambda item: -item[1]['seconds']):
+        row = f"  {label:<18}{stage['calls']:>7}{stage['seconds']:>10.3f}"
+        lines.append(row + f"{stage['peak'] / 2**20:>11.1f}" if profile is not None else row)
+
+    if profile is not None:
+        lines.append("")
+        lines.append("Hottest project functions (by cumulative time)")
+        lines.append(f"  {'cumulative s':>12}{'own s':>9}{'calls':>9}  function")
+        for cumulative, own, calls, name in _hotspot_rows(profile, limit):
+            lines.append(f"  {cumulative:>12.3f}{own:>9.3f}{calls:>9}  {name}")
+
+    if sampler.ticker_samples:
+        lines.append("")
+        lines.append("Slowest tickers (approximate analysis time from samples)")
+        for ticker, samples in sampler.ticker_samples.most_common(limit):
+            lines.append(f"  {samples * sampler.interval:>8.3f}s  {ticker}")
+
+    report = "\n".join(lines)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(report + "\n")
+    return report
+
+def profile_scan(scan, output_dir: str = PROFILE_DIR, sampler_only: bool = False):
+    """
+    Runs a scan under the profilers and writes the results to output_dir:
+
+    - <name>.folded: sampled stacks for flamegraph.pl or speedscope
+    - <name>.prof: cProfile data for snakeviz or pstats
+    - <name>.txt: stage timings with peak memory, hottest functions and slowest tickers
+
+    Args:
+        scan (callable): Runs the scan, e.g. main.run_automated_scan.
+        output_dir (str): Where to write the profile files.
+        sampler_only (bool): Run only the stack sampler and stage timers, without cProfile and
+            tracemalloc, so their overhead doesn't skew the samples. No .prof file is written.
+
+    Returns:
+        The scan's return value.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, f"scan-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+
+    tracker = StageTracker()
+    sampler = SamplingProfiler()
+    profile = None if sampler_only else cProfile.Profile()
+    patched = _instrument(tracker)
+
+    if profile is not None:
+        tracemalloc.start()
+    sampler.start()
+    started = time.perf_counter()
+    if profile is not None:
+        profile.enable()
+    try:
+        return scan()
+    finally:
+        if profile is not None:
+            profile.disable()
+        total_seconds = time.perf_counter() - started
+        sampler.stop()
+        if profile is not None:
+            tracemalloc.stop()
+        for module, func_name, original in patched:
+            setattr(module, func_name, original)
+
+        sampler.write_folded(f"{base}.folded")
+        saved = [f"{base}.folded (flame graph)"]
+        if profile is not None:
+            profile.dump_stats(f"{base}.prof")
+            saved.append(f"{base}.prof")
+        report = _write_report(f"{base}.txt", total_seconds, tracker, sampler, profile)
+        print(f"\n🔬 {report}")
+        print(f"\n🔬 Profile saved: {', '.join(saved + [f'{base}.txt'])}")
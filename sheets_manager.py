@@ -30,13 +30,20 @@ def connect_to_sheet():
         print(f"❌ Google Sheets connection failed: {e}")
         return None
 
+TRADE_LOG_COLUMNS = ["Ticker", "Strategy", "Buy Date", "Buy Price", "Sell Date", "Sell Price", "P&L"]
+ML_ANALYTICS_COLUMNS = ["Ticker", "Prediction Accuracy (%)"]
+
+def get_worksheet(sheet, worksheet_name: str):
+    """Returns a worksheet by name, creating it if it doesn't exist."""
+    try:
+        return sheet.worksheet(worksheet_name)
+    except gspread.WorksheetNotFound:
+        return sheet.add_worksheet(title=worksheet_name, rows="100", cols="20")
+
 def log_to_sheet(sheet, worksheet_name: str, data: list):
     """Logs data to a specified worksheet, creating it if it doesn't exist."""
     try:
-        try:
-            worksheet = sheet.worksheet(worksheet_name)
-        except gspread.WorksheetNotFound:
-            worksheet = sheet.add_worksheet(title=worksheet_name, rows="100", cols="20")
+        worksheet = get_worksheet(sheet, worksheet_name)
         
         df = pd.DataFrame(data)
         worksheet.clear()
@@ -49,13 +56,35 @@ def log_to_sheet(sheet, worksheet_name: str, data: list):
         print(f"❌ Error logging to '{worksheet_name}': {e}")
         return False
 
-def log_trades_and_pnl(all_trades: dict):
-    """Logs trade signals, P&L, and a summary to Google Sheets."""
-    sheet = connect_to_sheet()
-    if not sheet:
+def start_scan_log(sheet):
+    """Clears the Trade Log and ML Analytics worksheets and writes their headers for a streaming scan."""
+    try:
+        for worksheet_name, columns in [("Trade Log", TRADE_LOG_COLUMNS), ("ML Analytics", ML_ANALYTICS_COLUMNS)]:
+            worksheet = get_worksheet(sheet, worksheet_name)
+            worksheet.clear()
+            worksheet.update([columns])
+        return True
+    except Exception as e:
+        print(f"❌ Error preparing scan log: {e}")
         return False
+
+def append_to_sheet(sheet, worksheet_name: str, data: list):
+    """Appends rows below the existing data of a worksheet, keeping what is already there."""
+    if not data:
+        return True
+    try:
+        worksheet = get_worksheet(sheet, worksheet_name)
+        worksheet.append_rows(pd.DataFrame(data).values.tolist())
         
-    # Prepare trade log data
+        print(f"✅ Data appended to '{worksheet_name}': {len(data)} rows")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error appending to '{worksheet_name}': {e}")
+        return False
+
+def trade_log_rows(all_trades: dict) -> list:
+    """Builds one Trade Log row per completed trade."""
     trade_log_data = []
     for ticker, trades in all_trades.items():
         for trade in trades:
@@ -63,24 +92,20 @@ def log_trades_and_pnl(all_trades: dict):
                 pnl = trade['sell_price'] - trade['buy_price']
                 trade_log_data.append({
                     "Ticker": ticker,
+                    "Strategy": trade.get('strategy', 'rsi_sma_crossover'),
                     "Buy Date": str(trade['buy_date'].date()),
                     "Buy Price": trade['buy_price'],
                     "Sell Date": str(trade['sell_date'].date()),
                     "Sell Price": trade['sell_price'],
                     "P&L": pnl
                 })
-    
-    if not trade_log_data:
-        print("⚠️  No completed trades to log.")
-        return False
-        
-    # Log trades and summary
-    log_to_sheet(sheet, "Trade Log", trade_log_data)
-    
-    df = pd.DataFrame(trade_log_data)
-    total_pnl = df['P&L'].sum()
-    total_trades = len(df)
-    winning_trades = len(df[df['P&L'] > 0])
+    return trade_log_data
+
+def log_summary(sheet, pnls: list):
+    """Writes the Summary P&L worksheet from the P&L of every completed trade."""
+    total_pnl = sum(pnls)
+    total_trades = len(pnls)
+    winning_trades = sum(1 for pnl in pnls if pnl > 0)
     win_ratio = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
     
     summary_data = [{
@@ -95,10 +120,36 @@ def log_trades_and_pnl(all_trades: dict):
     
     return log_to_sheet(sheet, "Summary P&L", summary_data)
 
+def log_trades_and_pnl(all_trades: dict):
+    """Logs trade signals, P&L, and a summary to Google Sheets."""
+    sheet = connect_to_sheet()
+    if not sheet:
+        return False
+        
+    # Prepare trade log data
+    trade_log_data = trade_log_rows(all_trades)
+    
+    if not trade_log_data:
+        print("⚠️  No completed trades to log.")
+        return False
+        
+    # Log trades and summary
+    log_to_sheet(sheet, "Trade Log", trade_log_data)
+    
+    return log_summary(sheet, [row['P&L'] for row in trade_log_data])
+
 def log_ml_analytics(ml_results: list):
     """Log ML model results to Google Sheets."""
     sheet = connect_to_sheet()
     if not sheet:
         return False
     
-    return log_to_sheet(sheet, "ML Analytics", ml_results)
\ No newline at end of file
+    return log_to_sheet(sheet, "ML Analytics", ml_results)
+
+def log_pnl_by_ticker(pnl_rows: list):
+    """Exports the per-ticker P&L summary from the trade database to Google Sheets."""
+    sheet = connect_to_sheet()
+    if not sheet or not pnl_rows:
+        return False
+    
+    return log_to_sheet(sheet, "P&L by Ticker", pnl_rows)
\ No newline at end of file
@@ -2,86 +2,192 @@
 import pandas as pd
 import numpy as np
 
-def calculate_rsi(prices, period=14):
-    """Calculate RSI manually to avoid pandas-ta dependency issues."""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+import kernels
+import indicators
+from config import RSI_METHOD
+
+def calculate_rsi(prices, period=14, method=RSI_METHOD):
+    """Calculate RSI manually to avoid pandas-ta dependency issues ('simple' or 'wilder' smoothing)."""
+    rsi = kernels.get_kernel(f"rsi_{method}")(prices.to_numpy(dtype=float), period)
+    return pd.Series(rsi, index=prices.index)
 
 def calculate_sma(prices, period):
     """Calculate Simple Moving Average."""
-    return prices.rolling(window=period).mean()
+    return pd.Series(kernels.sma(prices.to_numpy(dtype=float), period), index=prices.index)
 
-def apply_trading_strategy(df: pd.DataFrame) -> list:
+class Strategy:
     """
-    [cite_start]Applies the RSI + Moving Average crossover strategy and returns a list of trades[cite: 5].
-    
+    Base class for strategy plugins.
+
+    A strategy declares the indicators it needs by name (see indicators.compute_indicators)
+    and turns them into entry/exit signals. The engine computes the union of all declared
+    indicators once per ticker and hands every strategy the same arrays, restricted to the
+    rows where its own indicators are defined.
+    """
+    name = None
+    indicators = []
+
+    def signals(self, data: dict):
+        """
+        Args:
+            data (dict): 'price' and each declared indicator as equal-length NumPy arrays.
+
+        Returns:
+            tuple: (entries, exits) boolean arrays. An entry opens a position when flat;
+            an exit closes it when one is open.
+        """
+        raise NotImplementedError
+
+STRATEGIES = {}
+
+def register_strategy(cls):
+    """Class decorator that makes a Strategy available to run_strategies by its name."""
+    STRATEGIES[cls.name] = cls
+    return cls
+
+def required_indicators(strategy_names: list) -> list:
+    """Returns the union of indicators declared by the named strategies, in declaration order."""
+    names = [name for name in strategy_names if name in STRATEGIES]
+    return list(dict.fromkeys(ind for name in names for ind in STRATEGIES[name].indicators))
+
+def _crossed_above(fast, slow):
+    """True where fast moves from <= slow on the previous row to > slow."""
+    crossed = np.zeros(len(fast), dtype=bool)
+    crossed[1:] = (fast[:-1] <= slow[:-1]) & (fast[1:] > slow[1:])
+    return crossed
+
+def _crossed_below(fast, slow):
+    """True where fast moves from >= slow on the previous row to < slow."""
+    crossed = np.zeros(len(fast), dtype=bool)
+    crossed[1:] = (fast[:-1] >= slow[:-1]) & (fast[1:] < slow[1:])
+    return crossed
+
+@register_strategy
+class RsiSmaCrossoverStrategy(Strategy):
+    """[cite_start]RSI + Moving Average crossover strategy[cite: 5]."""
+    name = 'rsi_sma_crossover'
+    indicators = ['RSI_14', 'SMA_20', 'SMA_50']
+
+    def signals(self, data):
+        # [cite_start]Buy Signal: RSI < 30 and 20-DMA crosses above 50-DMA [cite: 12, 13]
+        entries = (data['RSI_14'] < 30) & _crossed_above(data['SMA_20'], data['SMA_50'])
+        # Sell Signal: 20-DMA crosses below 50-DMA
+        exits = _crossed_below(data['SMA_20'], data['SMA_50'])
+        return entries, exits
+
+@register_strategy
+class RsiReversionStrategy(Strategy):
+    """Mean reversion: buy when RSI is oversold (< 30), sell when it is overbought (> 70)."""
+    name = 'rsi_reversion'
+    indicators = ['RSI_14']
+
+    def signals(self, data):
+        return data['RSI_14'] < 30, data['RSI_14'] > 70
+
+def _walk_positions(entries, exits, dates, prices) -> list:
+    """Turns entry/exit signals into trades, holding at most one open position."""
+    trades = []
+    position_open = False
+
+    # Only rows carrying a signal can change the position
+    for i in np.flatnonzero(entries | exits):
+        if not position_open and entries[i]:
+            trades.append({'buy_date': dates[i], 'buy_price': prices[i]})
+            position_open = True
+        elif position_open and exits[i]:
+            trades[-1].update({'sell_date': dates[i], 'sell_price': prices[i]})
+            position_open = False
+    return trades
+
+def run_strategies(df: pd.DataFrame, strategy_names: list = None, panel_view: pd.DataFrame = None) -> dict:
+    """
+    Evaluates several strategies on one ticker over a single shared set of indicators.
+
     Args:
         df (pd.DataFrame): DataFrame with stock data.
+        strategy_names (list, optional): Names of registered strategies. Defaults to all of them.
+        panel_view (pd.DataFrame, optional): Precomputed indicators for this ticker from
+            indicators.ticker_view. Any indicator it provides is not recomputed.
 
     Returns:
-        list: A list of dictionaries, where each dictionary represents a trade.
+        dict: Maps each strategy name to its list of trades.
     """
+    if strategy_names is None:
+        strategy_names = list(STRATEGIES)
+    unknown = [name for name in strategy_names if name not in STRATEGIES]
+    if unknown:
+        print(f"Error: Unknown strategies {unknown}. Available: {list(STRATEGIES)}")
+    plugins = [STRATEGIES[name]() for name in strategy_names if name in STRATEGIES]
+    results = {plugin.name: [] for plugin in plugins}
+
     if df is None or df.empty:
         print("Error: No data provided for strategy analysis")
-        return []
+        return results
     
     if len(df) < 50:  # Need at least 50 days for the 50-DMA
         print(f"Error: Insufficient data for strategy analysis. Need at least 50 rows, got {len(df)}")
-        return []
+        return results
 
     try:
         # Determine which price column to use
         price_column = 'Adj Close' if 'Adj Close' in df.columns else 'Close'
         if price_column not in df.columns:
             print(f"Error: No price column found. Available columns: {list(df.columns)}")
-            return []
+            return results
         
         print(f"Using '{price_column}' column for price data")
-        
-        # Calculate technical indicators manually
-        df['RSI_14'] = calculate_rsi(df[price_column], 14)
-        df['SMA_20'] = calculate_sma(df[price_column], 20)
-        df['SMA_50'] = calculate_sma(df[price_column], 50)
-        df.dropna(inplace=True) # Remove rows with NaN values after indicator calculation
-        df.reset_index(inplace=True)
-        
-        if len(df) < 2:  # Need at least 2 rows after indicator calculation
-            print("Error: Insufficient data after indicator calculation")
-            return []
+
+        prices = df[price_column]
+        if isinstance(prices, pd.DataFrame):  # yfinance may return (field, ticker) columns
+            prices = prices.iloc[:, 0]
+        data = {'price': prices.to_numpy(dtype=float)}
+
+        # Compute the union of every strategy's indicators once, reusing panel mode results
+        needed = required_indicators([plugin.name for plugin in plugins])
+        missing = []
+        for name in needed:
+            if panel_view is not None and name in panel_view.columns:
+                data[name] = panel_view[name].reindex(df.index).to_numpy(dtype=float)
+            else:
+                missing.append(name)
+        data.update(indicators.compute_indicators(data['price'], missing))
     except Exception as e:
         print(f"Error calculating technical indicators: {e}")
-        return []
+        return results
 
-    trades = []
-    position_open = False
-    
-    for i in range(1, len(df)):
+    dates = df.index
+    for plugin in plugins:
         try:
-            # [cite_start]Buy Signal: RSI < 30 and 20-DMA crosses above 50-DMA [cite: 12, 13]
-            if (not position_open and 
-                df['RSI_14'][i] < 30 and 
-                df['SMA_20'][i-1] <= df['SMA_50'][i-1] and 
-                df['SMA_20'][i] > df['SMA_50'][i]):
-                
-                buy_price = df[price_column][i]
-                trade = {'buy_date': df['Date'][i], 'buy_price': buy_price}
-                trades.append(trade)
-                position_open = True
-
-            # Sell Signal: 20-DMA crosses below 50-DMA
-            elif (position_open and 
-                  df['SMA_20'][i-1] >= df['SMA_50'][i-1] and 
-                  df['SMA_20'][i] < df['SMA_50'][i]):
-                
-                sell_price = df[price_column][i]
-                trades[-1].update({'sell_date': df['Date'][i], 'sell_price': sell_price})
-                position_open = False
+            # Skip the warm-up rows where any of this strategy's inputs is undefined
+            valid = ~np.isnan(data['price'])
+            for name in plugin.indicators:
+                valid &= ~np.isnan(data[name])
+            rows = np.flatnonzero(valid)
+            if len(rows) < 2:  # Need at least 2 rows after indicator calculation
+                print(f"Error: Insufficient data after indicator calculation for '{plugin.name}'")
+                continue
+
+            view = {name: data[name][rows] for name in ['price'] + plugin.indicators}
+            with np.errstate(invalid='ignore'):
+                entries, exits = plugin.signals(view)
+            results[plugin.name] = _walk_positions(
+                np.asarray(entries, dtype=bool), np.asarray(exits, dtype=bool), dates[rows], view['price']
+            )
         except Exception as e:
-            print(f"Error processing trade at index {i}: {e}")
-            continue
-            
-    return trades
\ No newline at end of file
+            print(f"Error evaluating strategy '{plugin.name}': {e}")
+
+    return results
+
+def apply_trading_strategy(df: pd.DataFrame, panel_view: pd.DataFrame = None) -> list:
+    """
+    [cite_start]Applies the RSI + Moving Average crossover strategy and returns a list of trades[cite: 5].
+    
+    Args:
+        df (pd.DataFrame): DataFrame with stock data.
+        panel_view (pd.DataFrame, optional): Precomputed indicators for this ticker from
+            indicators.ticker_view. When given, they are used instead of recomputing.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary represents a trade.
+    """
+    return run_strategies(df, [RsiSmaCrossoverStrategy.name], panel_view)[RsiSmaCrossoverStrategy.name]
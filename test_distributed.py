@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pandas as pd
+
+import distributed
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Child worker with stubbed fetch and analysis, so no network is needed
+STUB_WORKER = textwrap.dedent("""
+    import sys
+    sys.path.insert(0, {repo!r})
+    import pandas as pd
+    import data_handler
+    import distributed
+
+    def fetch(tickers, start_date, end_date):
+        return {{ticker: pd.DataFrame({{'Close': [1.0]}}) for ticker in tickers}}
+
+    def analyze(stock_data):
+        trades = {{ticker: [{{'buy_date': pd.Timestamp('2024-01-02'), 'buy_price': 1.0}}] for ticker in stock_data}}
+        return trades, [{{'Ticker': ticker, 'Prediction Accuracy (%)': '50.00'}} for ticker in stock_data]
+
+    data_handler.fetch_data = fetch
+    if {die_mid_shard}:
+        distributed.FileBroker({broker!r}).claim()  # Take a shard, then die without finishing it
+        sys.exit(1)
+    distributed.run_worker(analyze, {broker!r}, lease_seconds={lease}, idle_exit_seconds=30)
+""")
+
+def _result(worker, buy_date='2024-01-02'):
+    return {"worker": worker, "all_trades": {"A": [{"buy_date": pd.Timestamp(buy_date), "buy_price": 1.0}]},
+            "ml_results": [], "analyzed": ["A"], "failed": []}
+
+def _expire_lease(broker, shard_id):
+    old = time.time() - 60
+    os.utime(os.path.join(broker.leased, f"{shard_id}.json"), (old, old))
+
+def test_stale_lease_is_requeued_and_claimed_again(tmp_path):
+    broker = distributed.FileBroker(str(tmp_path))
+    broker.submit("scan-00000", {"tickers": ["A"]})
+
+    assert broker.claim() == ("scan-00000", {"tickers": ["A"]})
+    assert broker.claim() == (None, None)
+    assert broker.requeue_expired(30) == []
+
+    _expire_lease(broker, "scan-00000")
+    assert broker.requeue_expired(30) == ["scan-00000"]
+    assert broker.claim() == ("scan-00000", {"tickers": ["A"]})
+
+def test_late_result_is_taken_once_and_duplicate_dropped(tmp_path):
+    broker = distributed.FileBroker(str(tmp_path))
+    broker.submit("scan-00000", {"tickers": ["A"]})
+    broker.claim()
+    _expire_lease(broker, "scan-00000")
+    broker.requeue_expired(30)
+    broker.claim()
+
+    broker.complete("scan-00000", _result("first"))   # The worker that lost its lease finishes late
+    result = broker.take_result("scan-00000")
+    broker.complete("scan-00000", _result("second"))  # The worker that took over finishes after that
+
+    assert result["worker"] == "first"
+    assert broker.take_result("scan-00000") is None
+    assert os.listdir(broker.results) == []
+    assert os.listdir(broker.leased) == []
+
+def test_take_result_restores_trade_dates(tmp_path):
+    broker = distributed.FileBroker(str(tmp_path))
+    broker.submit("scan-00000", {"tickers": ["A"]})
+    broker.claim()
+    broker.complete("scan-00000", _result("worker", buy_date='2024-03-05'))
+
+    trade = broker.take_result("scan-00000")["all_trades"]["A"][0]
+    assert isinstance(trade["buy_date"], pd.Timestamp)
+    assert trade["buy_date"] == pd.Timestamp('2024-03-05')
+
+def test_dead_worker_is_respawned_and_its_shard_finished(tmp_path, monkeypatch):
+    broker_dir = str(tmp_path)
+    lease_seconds = 1
+    spawned = []
+
+    def spawn(count, broker_dir):
+        workers = []
+        for _ in range(count):
+            code = STUB_WORKER.format(repo=REPO_DIR, broker=broker_dir, lease=lease_seconds,
+                                      die_mid_shard=not spawned)
+            spawned.append(subprocess.Popen([sys.executable, "-c", code]))
+            workers.append(spawned[-1])
+        return workers
+
+    monkeypatch.setattr(distributed, "spawn_local_workers", spawn)
+    tickers = ["A", "B", "C", "D"]
+    all_trades, ml_results, analyzed, failed = distributed.run_coordinator(
+        tickers, "2024-01-01", "2024-06-01", shard_size=2, local_workers=1,
+        broker_dir=broker_dir, lease_seconds=lease_seconds, timeout=60)
+
+    assert len(spawned) >= 2
+    assert spawned[0].returncode == 1
+    assert list(all_trades) == tickers
+    assert [result['Ticker'] for result in ml_results] == tickers
+    assert analyzed == len(tickers)
+    assert failed == []
+    assert all(isinstance(trades[0]['buy_date'], pd.Timestamp) for trades in all_trades.values())
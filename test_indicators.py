@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+import indicators
+
+NAMES = ['RSI_14', 'SMA_20', 'EMA_12', 'MACD_12_26_9', 'MACDs_12_26_9', 'MACDh_12_26_9']
+
+def _prices(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-01', periods=n)
+    return pd.Series(1e3 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), index=dates)
+
+def test_panel_with_gaps_matches_each_ticker_alone():
+    full = _prices(seed=1)
+    gappy = _prices(seed=2).drop(_prices().index[[30, 31, 32, 100, 180]])
+    late = _prices(seed=3).iloc[40:]
+    stock_data = {ticker: pd.DataFrame({'Adj Close': prices})
+                  for ticker, prices in (('FULL', full), ('GAPPY', gappy), ('LATE', late))}
+
+    panel = indicators.build_price_panel(stock_data)
+    views = indicators.compute_panel_indicators(panel, NAMES)
+
+    for ticker, data in stock_data.items():
+        view = indicators.ticker_view(views, ticker)
+        alone = indicators.compute_indicators(data['Adj Close'].to_numpy(), NAMES)
+        assert view.index.equals(data.index)
+        for name in NAMES:
+            np.testing.assert_allclose(view[name].to_numpy(), alone[name], rtol=1e-10, equal_nan=True)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import kernels
+
+def _prices(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(1e4 * np.exp(np.cumsum(rng.normal(0, 0.02, n))))
+
+def _with_leading_nan(prices, count=25):
+    shifted = prices.copy()
+    shifted.iloc[:count] = np.nan
+    return shifted
+
+def reference_rsi(prices, period=14):
+    """The pandas RSI that strategy.calculate_rsi and ml_model.calculate_rsi used before the kernels."""
+    delta = prices.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+def reference_wilder(prices, period=14):
+    """Textbook Wilder RSI: seed with the mean of the first `period` changes, then smooth."""
+    values = prices.to_numpy(dtype=float)
+    out = np.full(len(values), np.nan)
+    start = np.flatnonzero(~np.isnan(values))[0]
+    delta = np.diff(values[start:])
+    gains, losses = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    out[start + period] = 100 - 100 / (1 + avg_gain / avg_loss)
+    for i in range(period, len(delta)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+        out[start + i + 1] = 100 - 100 / (1 + avg_gain / avg_loss)
+    return out
+
+def _assert_close(actual, expected):
+    np.testing.assert_allclose(actual, np.asarray(expected, dtype=float), rtol=1e-8, atol=1e-8, equal_nan=True)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sma_matches_rolling_mean(seed):
+    prices = _prices(seed=seed)
+    _assert_close(kernels.sma(prices.to_numpy(), 20), prices.rolling(window=20).mean())
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ema_matches_pandas_ewm(seed):
+    prices = _prices(seed=seed)
+    _assert_close(kernels.ema(prices.to_numpy(), 12), prices.ewm(span=12).mean())
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rsi_simple_matches_previous_calculate_rsi(seed):
+    prices = _prices(seed=seed)
+    _assert_close(kernels.rsi_simple(prices.to_numpy()), reference_rsi(prices))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rsi_wilder_matches_reference(seed):
+    prices = _prices(seed=seed)
+    _assert_close(kernels.rsi_wilder(prices.to_numpy()), reference_wilder(prices))
+
+def test_panel_columns_match_single_series_with_leading_nans():
+    full = _prices(seed=7)
+    late = _with_leading_nan(_prices(seed=8))
+    panel = np.column_stack([full.to_numpy(), late.to_numpy()])
+    valid = late.notna().to_numpy()
+
+    _assert_close(kernels.sma(panel, 20)[:, 0], full.rolling(window=20).mean())
+    _assert_close(kernels.sma(panel, 20)[:, 1], late.rolling(window=20).mean())
+    _assert_close(kernels.ema(panel, 12)[:, 1], late.ewm(span=12).mean())
+    _assert_close(kernels.rsi_simple(panel)[:, 0], reference_rsi(full))
+    _assert_close(kernels.rsi_simple(panel)[valid, 1], reference_rsi(late[valid]))
+    _assert_close(kernels.rsi_wilder(panel)[:, 0], reference_wilder(full))
+    _assert_close(kernels.rsi_wilder(panel)[:, 1], reference_wilder(late))
+
+def test_sma_is_stable_on_large_prices():
+    prices = _prices(n=5000) + 1e6
+    _assert_close(kernels.sma(prices.to_numpy(), 50), prices.rolling(window=50).mean())
+
+def test_rsi_of_flat_and_rising_prices():
+    flat = np.full(40, 5.0)
+    rising = np.arange(40.0)
+    assert np.isnan(kernels.rsi_simple(flat)[-1])
+    assert np.isnan(kernels.rsi_wilder(flat)[-1])
+    assert kernels.rsi_simple(rising)[-1] == 100.0
+    assert kernels.rsi_wilder(rising)[-1] == 100.0
+
+def test_get_kernel_by_name():
+    assert kernels.get_kernel('SMA') is kernels.sma
+    assert kernels.get_kernel('rsi') is kernels.rsi_simple
+    assert kernels.get_kernel('rsi_wilder') is kernels.rsi_wilder
+
+def test_get_kernel_unknown_name():
+    with pytest.raises(ValueError, match="Unknown indicator kernel 'foo'"):
+        kernels.get_kernel('foo')
@@ -0,0 +1,218 @@
+import sqlite3
+from datetime import datetime
+
+from config import TRADE_DB_PATH, TRADE_DB_TIMEOUT
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    mode TEXT,
+    universe_size INTEGER,
+    analyzed INTEGER,
+    alerts_sent INTEGER
+);
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id INTEGER NOT NULL REFERENCES scans(id),
+    ticker TEXT NOT NULL,
+    strategy TEXT,
+    buy_date TEXT NOT NULL,
+    buy_price REAL NOT NULL,
+    sell_date TEXT,
+    sell_price REAL,
+    pnl REAL
+);
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id INTEGER NOT NULL REFERENCES scans(id),
+    ticker TEXT NOT NULL,
+    strategy TEXT,
+    date TEXT NOT NULL,
+    side TEXT NOT NULL,
+    price REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ml_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id INTEGER NOT NULL REFERENCES scans(id),
+    ticker TEXT NOT NULL,
+    accuracy REAL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_scan ON trades(scan_id);
+CREATE INDEX IF NOT EXISTS idx_trades_ticker ON trades(ticker, sell_date);
+CREATE INDEX IF NOT EXISTS idx_trades_sell_date ON trades(sell_date);
+CREATE INDEX IF NOT EXISTS idx_signals_scan ON signals(scan_id);
+CREATE INDEX IF NOT EXISTS idx_signals_ticker ON signals(ticker, date);
+CREATE INDEX IF NOT EXISTS idx_ml_metrics_scan ON ml_metrics(scan_id);
+CREATE INDEX IF NOT EXISTS idx_ml_metrics_ticker ON ml_metrics(ticker);
+"""
+
+def connect_store(path: str = TRADE_DB_PATH):
+    """
+    Opens the local trade database, creating the schema on first use.
+
+    Args:
+        path (str): SQLite file path.
+
+    Returns:
+        sqlite3.Connection or None if the database can't be opened.
+    """
+    try:
+        # Wait for locks held by other writers (e.g. a concurrent scan) instead of failing at once
+        conn = sqlite3.connect(path, timeout=TRADE_DB_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        # WAL lets queries read while a scan is writing; NORMAL sync is durable across app crashes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+    except sqlite3.Error as e:
+        print(f"❌ Could not open trade database {path}: {e}")
+        return None
+
+def start_scan(conn, mode: str, universe_size: int):
+    """Records the start of a scan and returns its scan id, or None if it couldn't be recorded."""
+    try:
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO scans (started_at, mode, universe_size) VALUES (?, ?, ?)",
+                (datetime.now().isoformat(timespec='seconds'), mode, universe_size)
+            )
+        return cursor.lastrowid
+    except sqlite3.Error as e:
+        print(f"❌ Error recording scan start to trade database: {e}")
+        return None
+
+def finish_scan(conn, scan_id: int, analyzed: int, alerts_sent: int) -> bool:
+    """Records the end of a scan. Returns True if it was written."""
+    try:
+        with conn:
+            conn.execute(
+                "UPDATE scans SET finished_at = ?, analyzed = ?, alerts_sent = ? WHERE id = ?",
+                (datetime.now().isoformat(timespec='seconds'), analyzed, alerts_sent, scan_id)
+            )
+        return True
+    except sqlite3.Error as e:
+        print(f"❌ Error recording scan end to trade database: {e}")
+        return False
+
+def record_results(conn, scan_id: int, all_trades: dict, ml_results: list):
+    """
+    Bulk inserts one batch of trades, their buy/sell signals and ML accuracies in a single transaction.
+
+    Args:
+        conn (sqlite3.Connection): Open store.
+        scan_id (int): Scan the results belong to.
+        all_trades (dict): Ticker to list of trades, as built by main.analyze_stocks.
+        ml_results (list): Dicts with 'Ticker' and 'Prediction Accuracy (%)'.
+
+    Returns:
+        bool: True if the batch was written.
+    """
+    trade_rows = []
+    signal_rows = []
+    for ticker, trades in all_trades.items():
+        for trade in trades:
+            strategy_name = trade.get('strategy')
+            buy_date = str(trade['buy_date'].date())
+            signal_rows.append((scan_id, ticker, strategy_name, buy_date, 'BUY', float(trade['buy_price'])))
+
+            sell_date = sell_price = pnl = None
+            if 'sell_price' in trade:
+                sell_date = str(trade['sell_date'].date())
+                sell_price = float(trade['sell_price'])
+                pnl = sell_price - float(trade['buy_price'])
+                signal_rows.append((scan_id, ticker, strategy_name, sell_date, 'SELL', sell_price))
+            trade_rows.append((scan_id, ticker, strategy_name, buy_date, float(trade['buy_price']),
+                               sell_date, sell_price, pnl))
+
+    ml_rows = [(scan_id, result['Ticker'], float(result['Prediction Accuracy (%)'])) for result in ml_results]
+
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO trades (scan_id, ticker, strategy, buy_date, buy_price, sell_date, sell_price, pnl) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", trade_rows)
+            conn.executemany(
+                "INSERT INTO signals (scan_id, ticker, strategy, date, side, price) VALUES (?, ?, ?, ?, ?, ?)",
+                signal_rows)
+            conn.executemany(
+                "INSERT INTO ml_metrics (scan_id, ticker, accuracy) VALUES (?, ?, ?)", ml_rows)
+        return True
+    except sqlite3.Error as e:
+        print(f"❌ Error recording results to trade database: {e}")
+        return False
+
+def latest_scan_id(conn):
+    """Returns the id of the most recent scan, or None if nothing has been recorded."""
+    row = conn.execute("SELECT MAX(id) FROM scans").fetchone()
+    return row[0]
+
+def pnl_by_ticker(conn, scan_id: int = None) -> list:
+    """
+    Aggregates completed-trade P&L per ticker for one scan (the latest by default).
+
+    Every scan re-detects the trades in its backtest window, so aggregates are
+    taken within a single scan rather than summed across scans.
+    """
+    if scan_id is None:
+        scan_id = latest_scan_id(conn)
+    rows = conn.execute("""
+        SELECT ticker,
+               COUNT(*) AS trades,
+               SUM(pnl) AS total_pnl,
+               SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) AS winning_trades
+        FROM trades
+        WHERE scan_id = ? AND pnl IS NOT NULL
+        GROUP BY ticker
+        ORDER BY total_pnl DESC
+    """, (scan_id,)).fetchall()
+    return [{
+        "Ticker": row['ticker'],
+        "Completed Trades": row['trades'],
+        "Total P&L": row['total_pnl'],
+        "Winning Trades": row['winning_trades'],
+    } for row in rows]
+
+def pnl_by_month(conn, scan_id: int = None, ticker: str = None) -> list:
+    """Aggregates completed-trade P&L by sell month for one scan (the latest by default), optionally for one ticker."""
+    if scan_id is None:
+        scan_id = latest_scan_id(conn)
+    query = """
+        SELECT substr(sell_date, 1, 7) AS month, COUNT(*) AS trades, SUM(pnl) AS total_pnl
+        FROM trades
+        WHERE scan_id = ? AND pnl IS NOT NULL
+    """
+    params = [scan_id]
+    if ticker:
+        query += " AND ticker = ?"
+        params.append(ticker)
+    query += " GROUP BY month ORDER BY month"
+    return [{
+        "Month": row['month'],
+        "Completed Trades": row['trades'],
+        "Total P&L": row['total_pnl'],
+    } for row in conn.execute(query, params).fetchall()]
+
+def ml_accuracy_history(conn, ticker: str) -> list:
+    """Returns the ML accuracy recorded for a ticker in every scan, oldest first."""
+    rows = conn.execute("""
+        SELECT s.started_at, m.accuracy
+        FROM ml_metrics m JOIN scans s ON s.id = m.scan_id
+        WHERE m.ticker = ?
+        ORDER BY m.scan_id
+    """, (ticker,)).fetchall()
+    return [{"Scan Time": row['started_at'], "Prediction Accuracy (%)": row['accuracy']} for row in rows]
+
+if __name__ == "__main__":
+    conn = connect_store()
+    if conn and latest_scan_id(conn) is not None:
+        print(f"📊 P&L by ticker (scan {latest_scan_id(conn)}):")
+        for row in pnl_by_ticker(conn):
+            print(f"   {row['Ticker']}: {row['Total P&L']:.2f} over {row['Completed Trades']} trades")
+        print("📅 P&L by month:")
+        for row in pnl_by_month(conn):
+            print(f"   {row['Month']}: {row['Total P&L']:.2f} over {row['Completed Trades']} trades")
+    else:
+        print("No scans recorded yet.")